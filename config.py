@@ -1,10 +1,16 @@
 import os
+import re
 
 # Configuration for Project Samarth
 
 # Data.gov.in API Configuration
 DATA_GOV_API_KEY = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"  # Public demo key
 DATA_GOV_BASE_URL = "https://api.data.gov.in"
+API_REQUESTS_PER_MINUTE = 10  # Sustained request rate kept under the per-IP quota
+API_REQUEST_BURST = 10  # Requests allowed back to back before pacing kicks in
+RATE_LIMIT_SLOWDOWN_SHARE = 0.2  # Pace harder once less than this share of the quota is left
+API_STATUS_RETRIES = 3  # Extra attempts after a 429 or 5xx response
+API_RETRY_AFTER_MAX_SECONDS = 10  # Longest Retry-After worth waiting for; longer ones give up at once
 
 # OpenAI Configuration (optional - for advanced NLP)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")  # Set this environment variable if you have OpenAI API
@@ -12,6 +18,10 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")  # Set this environment variabl
 # Cache Configuration
 CACHE_DURATION_SECONDS = 3600  # 1 hour for most data
 PRICE_CACHE_DURATION_SECONDS = 1800  # 30 minutes for price data
+CACHE_STALE_GRACE_SECONDS = 600  # Serve stale entries this long while revalidating in the background
+CACHE_ERROR_BACKOFF_SECONDS = 60  # After a failed refresh, serve the expired entry this long before retrying
+MEMORY_CACHE_MAX_ENTRIES = 128  # In-process copies kept on top of the disk cache
+QUERY_CACHE_TTL_SECONDS = 300  # Queries this close together share one fetch per data source
 
 # Known Dataset Resource IDs from data.gov.in
 DATASET_IDS = {
@@ -34,4 +44,11 @@ MAJOR_CROPS = [
     "Rice", "Wheat", "Cotton", "Sugarcane", "Maize", "Bajra", "Jowar", 
     "Pulses", "Oilseeds", "Groundnut", "Soybean", "Mustard", "Sunflower",
     "Barley", "Gram", "Tur", "Moong", "Urad", "Lentil", "Chickpea"
-]
\ No newline at end of file
+]
+
+# Membership views of the lists above; keep the lists for ordered display
+INDIAN_STATES_SET = frozenset(s.lower() for s in INDIAN_STATES)
+MAJOR_CROPS_SET = frozenset(c.lower() for c in MAJOR_CROPS)
+
+# Finds any state name in free text in one pass
+INDIAN_STATES_RE = re.compile(r'\b(' + '|'.join(map(re.escape, INDIAN_STATES)) + r')\b', re.I)
\ No newline at end of file
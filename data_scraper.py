@@ -1,13 +1,324 @@
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InvalidHeader
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import json
+import functools
+import random
+import hashlib
+import itertools
+import sys
+import threading
 import time
-from typing import Dict, List, Any
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Any, Callable, Iterator, Optional, Tuple
 import os
 from urllib.parse import urljoin
-from config import DATA_GOV_API_KEY, DATA_GOV_BASE_URL, DATASET_IDS, CACHE_DURATION_SECONDS
+from config import (DATA_GOV_API_KEY, DATA_GOV_BASE_URL, DATASET_IDS, CACHE_DURATION_SECONDS,
+                    PRICE_CACHE_DURATION_SECONDS, CACHE_STALE_GRACE_SECONDS, CACHE_ERROR_BACKOFF_SECONDS,
+                    MEMORY_CACHE_MAX_ENTRIES, API_REQUESTS_PER_MINUTE, API_REQUEST_BURST,
+                    RATE_LIMIT_SLOWDOWN_SHARE, API_STATUS_RETRIES, API_RETRY_AFTER_MAX_SECONDS)
 from logger import samarth_logger
 
+try:
+    import orjson
+    
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:  # Fall back to the stdlib encoder when orjson isn't installed
+    def _json_loads(raw: bytes) -> Any:
+        return json.loads(raw)
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    import xxhash
+    
+    def _digest(raw: bytes) -> str:
+        return xxhash.xxh64_hexdigest(raw)
+except ImportError:  # blake2b is slower but always available
+    def _digest(raw: bytes) -> str:
+        return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+try:
+    import zstandard
+    
+    # Level 3 cuts cached JSON 5-10x for next to no CPU; reading the smaller file back is faster too
+    _CACHE_SUFFIX = ".json.zst"
+    
+    def _compress(raw: bytes) -> bytes:
+        return zstandard.compress(raw, 3)
+    
+    def _decompress(raw: bytes) -> bytes:
+        try:
+            return zstandard.decompress(raw)
+        except zstandard.ZstdError as e:  # Surface corrupt files the same way as bad JSON
+            raise ValueError(e) from e
+except ImportError:  # Without zstandard cache files are stored as plain JSON
+    _CACHE_SUFFIX = ".json"
+    
+    def _compress(raw: bytes) -> bytes:
+        return raw
+    
+    def _decompress(raw: bytes) -> bytes:
+        return raw
+
+try:
+    import ijson
+except ImportError:  # Without ijson the whole response body is decoded up front
+    ijson = None
+
+
+def iter_records(response: requests.Response, limit: int = None) -> Iterator[Dict]:
+    """Yield the records of a data.gov.in API response as they are parsed"""
+    try:
+        if ijson is not None:
+            # Read straight off the socket so records are processed while the body is still arriving
+            response.raw.decode_content = True
+            records = ijson.items(response.raw, 'records.item', use_float=True)
+        else:
+            api_data = _json_loads(response.content)
+            records = api_data.get("records", api_data.get("data", []))
+        yield from itertools.islice(records, limit)
+    finally:
+        response.close()
+
+
+def _label(value: Any) -> Any:
+    """Intern a label that repeats across records (state, district, crop); non-strings pass through"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    """Parse a numeric API field, treating blanks and junk as the default"""
+    if not value:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+# Responses worth another attempt once the server has had a moment
+_RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+class _PacedAdapter(HTTPAdapter):
+    """Connection pool that spaces requests out with a token bucket to stay under the API quota"""
+    
+    def __init__(self, requests_per_minute: int, burst: int, **kwargs):
+        super().__init__(**kwargs)
+        self.interval = 60.0 / requests_per_minute
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._pace_lock = threading.Lock()
+        
+    def send(self, request, **kwargs):
+        # Status retries run here rather than inside urllib3, so every attempt that reaches
+        # the server draws its own token. urllib3 only retries failed connections.
+        for attempt in range(API_STATUS_RETRIES + 1):
+            self._acquire()
+            response = super().send(request, **kwargs)
+            self._observe(response)
+            if response.status_code not in _RETRY_STATUSES or attempt == API_STATUS_RETRIES:
+                return response
+            delay = self._retry_delay(response, attempt)
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
+        
+    def _retry_delay(self, response: requests.Response, attempt: int) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None if the server wants longer than we'll wait"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            try:
+                delay = self.max_retries.parse_retry_after(retry_after)
+            except InvalidHeader:
+                delay = None
+            if delay is not None:
+                # Waiting out a long Retry-After would stall every query needing this source;
+                # giving up lets the caller serve its cached or sample data instead
+                return delay if delay <= API_RETRY_AFTER_MAX_SECONDS else None
+        # Jittered exponential backoff keeps parallel callers from retrying in lockstep
+        return 0.3 * 2 ** attempt + random.uniform(0, 0.3)
+        
+    def _acquire(self):
+        """Wait for a token; a request that finds none reserves the next one"""
+        with self._pace_lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+            self.updated = now
+            self.tokens -= 1
+            wait = max(-self.tokens * self.interval, self.paused_until - now)
+        if wait > 0:
+            time.sleep(wait)
+            
+    def _observe(self, response: requests.Response):
+        """Slow down once the API reports that less than a fifth of the quota is left"""
+        try:
+            remaining = int(response.headers["X-RateLimit-Remaining"])
+            limit = int(response.headers["X-RateLimit-Limit"])
+        except (KeyError, ValueError):
+            return
+        if remaining < limit * RATE_LIMIT_SLOWDOWN_SHARE:
+            # Leave one full interval before the next request, whatever the bucket holds
+            with self._pace_lock:
+                self.paused_until = max(self.paused_until, time.monotonic() + self.interval)
+
+
+# Fallback payloads served when data.gov.in is unreachable. They are shared across
+# calls and returned as-is, so callers must treat them as read-only.
+
+# Enhanced mock data with diverse crops and states
+_AGRI_MOCK_DATA = {
+    "source": "Ministry of Agriculture & Farmers Welfare (Sample Data)",
+    "url": "https://data.gov.in/resource/crop-production-statistics",
+    "data": [
+        # Maharashtra - Rice
+        {
+            "state": "Maharashtra",
+            "district": "Pune",
+            "crop": "Rice",
+            "production_tonnes": 125000,
+            "area_hectares": 50000,
+            "year": 2023,
+            "market_price": "2800"
+        },
+        {
+            "state": "Maharashtra", 
+            "district": "Nashik",
+            "crop": "Rice",
+            "production_tonnes": 98000,
+            "area_hectares": 40000,
+            "year": 2023,
+            "market_price": "2850"
+        },
+        # Punjab - Rice & Wheat
+        {
+            "state": "Punjab",
+            "district": "Ludhiana", 
+            "crop": "Rice",
+            "production_tonnes": 280000,
+            "area_hectares": 80000,
+            "year": 2023,
+            "market_price": "2750"
+        },
+        {
+            "state": "Punjab",
+            "district": "Amritsar", 
+            "crop": "Wheat",
+            "production_tonnes": 320000,
+            "area_hectares": 90000,
+            "year": 2023,
+            "market_price": "2200"
+        },
+        {
+            "state": "Punjab",
+            "district": "Ludhiana", 
+            "crop": "Wheat",
+            "production_tonnes": 350000,
+            "area_hectares": 95000,
+            "year": 2023,
+            "market_price": "2180"
+        },
+        # Uttar Pradesh - Wheat
+        {
+            "state": "Uttar Pradesh",
+            "district": "Lucknow", 
+            "crop": "Wheat",
+            "production_tonnes": 180000,
+            "area_hectares": 60000,
+            "year": 2023,
+            "market_price": "2250"
+        },
+        # Haryana - Wheat
+        {
+            "state": "Haryana",
+            "district": "Gurgaon", 
+            "crop": "Wheat",
+            "production_tonnes": 150000,
+            "area_hectares": 55000,
+            "year": 2023,
+            "market_price": "2220"
+        }
+    ]
+}
+
+# Enhanced mock data with realistic Indian climate values for multiple states
+_CLIMATE_MOCK_DATA = {
+    "source": "India Meteorological Department (Sample Data)",
+    "url": "https://data.gov.in/resource/district-wise-seasonal-and-annual-rainfall",
+    "data": [
+        # Maharashtra
+        {
+            "state": "Maharashtra",
+            "district": "Pune", 
+            "rainfall_mm": 722.0,
+            "temperature_avg": 24.5,
+            "month": "Annual"
+        },
+        {
+            "state": "Maharashtra",
+            "district": "Mumbai",
+            "rainfall_mm": 2167.0,
+            "temperature_avg": 27.2,
+            "month": "Annual"
+        },
+        {
+            "state": "Maharashtra",
+            "district": "Nashik",
+            "rainfall_mm": 508.0,
+            "temperature_avg": 25.8,
+            "month": "Annual"
+        },
+        # Punjab
+        {
+            "state": "Punjab",
+            "district": "Ludhiana",
+            "rainfall_mm": 709.0,
+            "temperature_avg": 23.8,
+            "month": "Annual"
+        },
+        {
+            "state": "Punjab",
+            "district": "Amritsar",
+            "rainfall_mm": 632.0,
+            "temperature_avg": 24.1,
+            "month": "Annual"
+        },
+        # Other states
+        {
+            "state": "Uttar Pradesh",
+            "district": "Lucknow",
+            "rainfall_mm": 896.0,
+            "temperature_avg": 25.4,
+            "month": "Annual"
+        },
+        {
+            "state": "Haryana",
+            "district": "Gurgaon",
+            "rainfall_mm": 553.0,
+            "temperature_avg": 25.2,
+            "month": "Annual"
+        }
+    ]
+}
+
+
+@functools.lru_cache(maxsize=32)
+def _climate_mock_data(year: int) -> Dict:
+    """Sample climate payload stamped with the requested year"""
+    return {
+        **_CLIMATE_MOCK_DATA,
+        "data": [{**record, "year": year} for record in _CLIMATE_MOCK_DATA["data"]]
+    }
+
 class DataScraper:
     def __init__(self):
         self.base_url = "https://data.gov.in"
@@ -15,12 +326,224 @@ class DataScraper:
         self.api_key = DATA_GOV_API_KEY
         self.cache_dir = "data_cache"
         self.dataset_ids = DATASET_IDS
+        self.session = self._create_session()
+        self._revalidating = set()
+        self._revalidate_lock = threading.Lock()
+        self._memo = OrderedDict()  # cache_file -> (monotonic fetch time, payload)
+        self._memo_lock = threading.Lock()
         self.ensure_cache_dir()
+        # Open a connection to the API while the caller is still setting up, so the
+        # first real request finds a live keep-alive socket in the pool
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        
+    def _create_session(self) -> requests.Session:
+        """Create a pooled keep-alive session shared by all API calls"""
+        session = requests.Session()
+        adapter = _PacedAdapter(
+            API_REQUESTS_PER_MINUTE,
+            API_REQUEST_BURST,
+            pool_connections=10,
+            pool_maxsize=20,
+            # Connection errors only; the adapter retries 429s and 5xx itself through the pacing
+            max_retries=Retry(total=3, backoff_factor=0.3, respect_retry_after_header=False)
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip"})
+        return session
+        
+    def _warm_up(self):
+        """Prime the session's connection pool with a cheap request to the API host"""
+        try:
+            self.session.head(self.api_base, timeout=5).close()
+        except requests.RequestException:
+            # The first real request will retry the connection and fall back to the sample data
+            pass
+        
+    def close(self):
+        """Release the pooled connections held by the session"""
+        self.session.close()
+        
+    async def __aenter__(self):
+        return self
+        
+    async def __aexit__(self, *exc_info):
+        self.close()
         
     def ensure_cache_dir(self):
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
     
+    def _cache_file(self, kind: str, *filters) -> str:
+        """Path of the cache entry for one kind of data and its filters"""
+        # Hashing the filters gives a short, fixed-length key that is always a safe filename
+        cache_key = f"{kind}_" + _digest("|".join(map(str, filters)).lower().encode())
+        return os.path.join(self.cache_dir, f"{cache_key}{_CACHE_SUFFIX}")
+    
+    def _read_cache(self, cache_file: str) -> Optional[Dict]:
+        """Load a cache entry ({etag, last_modified, digest, body}) from disk"""
+        try:
+            with open(cache_file, 'rb') as f:
+                entry = _json_loads(_decompress(f.read()))
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and "body" in entry else None
+    
+    def _write_cache(self, cache_file: str, data: Dict, response: requests.Response = None, previous: Dict = None):
+        """Write a payload to the disk cache along with the validators needed to revalidate it"""
+        raw = _json_dumps(data)
+        entry = {
+            "etag": response.headers.get("ETag") if response is not None else None,
+            "last_modified": response.headers.get("Last-Modified") if response is not None else None,
+            "digest": _digest(raw)
+        }
+        
+        if previous and all(previous.get(key) == value for key, value in entry.items()):
+            # Upstream sent the same body again; refreshing the fetch time is enough
+            os.utime(cache_file)
+            return
+        
+        entry["body"] = data
+        # Write beside the target and swap it in, so a crash never leaves a truncated entry behind.
+        # The temp name is per thread because scrapers in other threads may refresh the same file.
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_file, 'wb') as f:
+            f.write(_compress(_json_dumps(entry)))
+        os.replace(tmp_file, cache_file)
+    
+    def _cached(self, cache_file: str, ttl: int, fetch: Callable[[Optional[Dict]], Optional[Dict]], label: str,
+                api_url: str) -> Optional[Dict]:
+        """Serve a cached payload, revalidating it in the background once it goes stale"""
+        data = self._recall(cache_file, ttl)
+        if data is not None:
+            self._log_access(label, api_url, data, cache_hit=True)
+            return data
+        
+        # One stat call both checks for the file and dates it, with no window between the two
+        try:
+            mtime = os.stat(cache_file).st_mtime
+        except FileNotFoundError:
+            mtime = None
+        
+        cached = None
+        if mtime is not None:
+            # The file's mtime is when it was last fetched or revalidated
+            file_age = time.time() - mtime
+            cached = self._read_cache(cache_file)
+            if cached is not None and file_age < ttl:
+                self._remember(cache_file, cached["body"], file_age)
+                self._log_access(label, api_url, cached["body"], cache_hit=True)
+                return cached["body"]
+            if cached is not None and file_age < ttl + CACHE_STALE_GRACE_SECONDS:
+                # Stale but within the grace window: answer now and refresh behind the caller
+                self._revalidate_in_background(cache_file, cached, fetch)
+                self._log_access(label, api_url, cached["body"], cache_hit=True)
+                return cached["body"]
+        
+        try:
+            data = fetch(cached)
+        except Exception as e:
+            print(f"Error fetching {label}: {e}")
+            data = None
+        if data is None and cached is not None:
+            # The API is failing or rate limiting us; an expired entry still beats the sample data.
+            # Keeping it in memory for a short while stops every call from re-running the retries.
+            self._remember(cache_file, cached["body"], max(0, ttl - CACHE_ERROR_BACKOFF_SECONDS))
+            self._log_access(label, api_url, cached["body"], cache_hit=True)
+            return cached["body"]
+        if data is not None:
+            self._remember(cache_file, data)
+            self._log_access(label, api_url, data, cache_hit=False)
+        return data
+        
+    def _log_access(self, label: str, api_url: str, data: Dict, cache_hit: bool):
+        """Record where a payload came from, so repeated runs show their cache hits"""
+        samarth_logger.log_data_source_access(label, api_url, True, len(data.get("data", [])), cache_hit)
+    
+    def _recall(self, key: str, ttl: int) -> Optional[Dict]:
+        """Return a payload from the in-process cache while it is still fresh"""
+        with self._memo_lock:
+            hit = self._memo.get(key)
+            if hit is None:
+                return None
+            if time.monotonic() - hit[0] >= ttl:
+                del self._memo[key]
+                return None
+            self._memo.move_to_end(key)
+            return hit[1]
+    
+    def _remember(self, key: str, data: Dict, age: float = 0.0):
+        """Keep a payload in the in-process cache, evicting the least recently used entries"""
+        with self._memo_lock:
+            self._memo[key] = (time.monotonic() - age, data)
+            self._memo.move_to_end(key)
+            while len(self._memo) > MEMORY_CACHE_MAX_ENTRIES:
+                self._memo.popitem(last=False)
+    
+    def _fetch(self, api_url: str, params: Dict, cache_file: str, cached: Optional[Dict],
+               process: Callable[[Iterator[Dict]], Dict]) -> Optional[Dict]:
+        """Fetch and process an API resource, using a conditional GET when a cached copy exists"""
+        headers = {}
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        response = self.session.get(api_url, params=params, headers=headers, timeout=10, stream=True)
+        try:
+            if response.status_code == 304 and cached:
+                # Not modified: the cached body is current again
+                os.utime(cache_file)
+                return cached["body"]
+            if response.status_code != 200:
+                return None
+            processed_data = process(iter_records(response, params["limit"]))
+        finally:
+            response.close()
+        
+        # Cache the real data
+        self._write_cache(cache_file, processed_data, response, cached)
+        return processed_data
+    
+    def _fetch_shared(self, api_url: str, params: Dict,
+                      targets: List[Tuple[str, int, Callable[[Iterator[Dict]], Dict]]]) -> Dict[str, Dict]:
+        """Fetch an API resource once and cut a (cache_file, limit, process) entry from it per target"""
+        response = self.session.get(api_url, params=params, timeout=10, stream=True)
+        try:
+            if response.status_code != 200:
+                return {}
+            records = list(iter_records(response, params["limit"]))
+        finally:
+            response.close()
+        
+        payloads = {}
+        for cache_file, limit, process in targets:
+            payloads[cache_file] = data = process(iter(records[:limit]))
+            # The validators only describe this entry if it holds the whole response
+            self._write_cache(cache_file, data, response if limit == params["limit"] else None, self._read_cache(cache_file))
+        return payloads
+    
+    def _revalidate_in_background(self, cache_file: str, cached: Dict, fetch: Callable[[Optional[Dict]], Optional[Dict]]):
+        """Refresh a stale cache entry without blocking the caller"""
+        with self._revalidate_lock:
+            if cache_file in self._revalidating:
+                return
+            self._revalidating.add(cache_file)
+        
+        def revalidate():
+            try:
+                data = fetch(cached)
+                if data is not None:
+                    self._remember(cache_file, data)
+            except Exception as e:
+                print(f"Error revalidating {cache_file}: {e}")
+            finally:
+                with self._revalidate_lock:
+                    self._revalidating.discard(cache_file)
+        
+        threading.Thread(target=revalidate, daemon=True).start()
+    
     def search_datasets(self, query: str, sector: str = None) -> List[Dict]:
         """Search for datasets on data.gov.in"""
         try:
@@ -29,7 +552,7 @@ class DataScraper:
             if sector:
                 params["sector"] = sector
                 
-            response = requests.get(search_url, params=params, timeout=10)
+            response = self.session.get(search_url, params=params, timeout=10)
             
             # For MVP, return mock data structure
             # In production, this would parse the actual search results
@@ -58,345 +581,154 @@ class DataScraper:
     
     def get_agricultural_data(self, state: str = None, crop: str = None) -> Dict:
         """Get real agricultural production data from data.gov.in"""
-        cache_key = f"agri_{state}_{crop}".replace(" ", "_").lower() if state or crop else "agri_all"
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        cache_file = self._cache_file("agri", state, crop)
+        
+        # Try to fetch real data from data.gov.in API
+        api_url = f"{self.api_base}/resource/{self.dataset_ids['crop_production']}"
+        params = {
+            "api-key": self.api_key,
+            "format": "json",
+            "limit": 100
+        }
+        
+        # Note: This API doesn't support filtering, so we'll fetch all data and filter locally
+        # if state:
+        #     params["filters[state]"] = state
+        # if crop:
+        #     params["filters[commodity]"] = crop
+        
+        def fetch(cached: Dict = None) -> Dict:
+            return self._fetch(api_url, params, cache_file, cached, self._process_agricultural_records)
         
         # Check cache first (cache for 1 hour)
-        if os.path.exists(cache_file):
-            file_age = time.time() - os.path.getmtime(cache_file)
-            if file_age < 3600:  # 1 hour cache
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+        data = self._cached(cache_file, CACHE_DURATION_SECONDS, fetch, "real agricultural data", api_url)
+        if data is not None:
+            return data
         
-        try:
-            # Try to fetch real data from data.gov.in API
-            api_url = f"{self.api_base}/resource/{self.dataset_ids['crop_production']}"
-            params = {
-                "api-key": self.api_key,
-                "format": "json",
-                "limit": 100
-            }
-            
-            # Note: This API doesn't support filtering, so we'll fetch all data and filter locally
-            # if state:
-            #     params["filters[state]"] = state
-            # if crop:
-            #     params["filters[commodity]"] = crop
-                
-            response = requests.get(api_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                api_data = response.json()
-                
-                # Process real data
-                processed_data = {
-                    "source": "Ministry of Agriculture & Farmers Welfare - data.gov.in (Live Market Data)",
-                    "url": "https://data.gov.in/resource/current-daily-price-various-commodities-various-markets-mandis",
-                    "data": []
-                }
-                
-                # Handle different possible API response structures
-                records = api_data.get("records", api_data.get("data", []))
-                if records:
-                    for record in records:
-                        # This API returns market price data, not production data
-                        # Let's adapt it to show market information as agricultural data
-                        state_name = record.get("state") or "Unknown"
-                        district_name = record.get("district") or "Unknown"
-                        crop_name = record.get("commodity") or "Unknown"
-                        
-                        # Convert price data to estimated production info
-                        modal_price = record.get("modal_price", "0")
-                        try:
-                            price_val = float(modal_price) if modal_price else 0
-                            # Estimate production based on market activity (higher prices = lower production)
-                            estimated_production = max(50000, 200000 - (price_val * 50)) if price_val > 0 else 100000
-                        except:
-                            estimated_production = 100000
-                        
-                        processed_data["data"].append({
-                            "state": state_name,
-                            "district": district_name,
-                            "crop": crop_name,
-                            "production_tonnes": estimated_production,
-                            "area_hectares": estimated_production / 2,  # Rough estimate
-                            "year": 2025,  # Current data
-                            "market_price": modal_price,
-                            "data_type": "market_derived"
-                        })
-                
-                # If we got real data, return it
-                if processed_data["data"]:
-                    # Cache the real data
-                    with open(cache_file, 'w') as f:
-                        json.dump(processed_data, f)
-                    return processed_data
-                
-                # Cache the real data
-                with open(cache_file, 'w') as f:
-                    json.dump(processed_data, f)
-                    
-                return processed_data
-                
-        except Exception as e:
-            print(f"Error fetching real agricultural data: {e}")
+        # Fall back to the sample data. Writing it to disk buys nothing, but keeping it in
+        # memory stops every call from retrying an unreachable API until the TTL expires.
+        self._remember(cache_file, _AGRI_MOCK_DATA)
         
-        # Enhanced mock data with diverse crops and states
-        mock_data = {
-            "source": "Ministry of Agriculture & Farmers Welfare (Sample Data)",
-            "url": "https://data.gov.in/resource/crop-production-statistics",
-            "data": [
-                # Maharashtra - Rice
-                {
-                    "state": "Maharashtra",
-                    "district": "Pune",
-                    "crop": "Rice",
-                    "production_tonnes": 125000,
-                    "area_hectares": 50000,
-                    "year": 2023,
-                    "market_price": "2800"
-                },
-                {
-                    "state": "Maharashtra", 
-                    "district": "Nashik",
-                    "crop": "Rice",
-                    "production_tonnes": 98000,
-                    "area_hectares": 40000,
-                    "year": 2023,
-                    "market_price": "2850"
-                },
-                # Punjab - Rice & Wheat
-                {
-                    "state": "Punjab",
-                    "district": "Ludhiana", 
-                    "crop": "Rice",
-                    "production_tonnes": 280000,
-                    "area_hectares": 80000,
-                    "year": 2023,
-                    "market_price": "2750"
-                },
-                {
-                    "state": "Punjab",
-                    "district": "Amritsar", 
-                    "crop": "Wheat",
-                    "production_tonnes": 320000,
-                    "area_hectares": 90000,
-                    "year": 2023,
-                    "market_price": "2200"
-                },
-                {
-                    "state": "Punjab",
-                    "district": "Ludhiana", 
-                    "crop": "Wheat",
-                    "production_tonnes": 350000,
-                    "area_hectares": 95000,
-                    "year": 2023,
-                    "market_price": "2180"
-                },
-                # Uttar Pradesh - Wheat
-                {
-                    "state": "Uttar Pradesh",
-                    "district": "Lucknow", 
-                    "crop": "Wheat",
-                    "production_tonnes": 180000,
-                    "area_hectares": 60000,
-                    "year": 2023,
-                    "market_price": "2250"
-                },
-                # Haryana - Wheat
-                {
-                    "state": "Haryana",
-                    "district": "Gurgaon", 
-                    "crop": "Wheat",
-                    "production_tonnes": 150000,
-                    "area_hectares": 55000,
-                    "year": 2023,
-                    "market_price": "2220"
-                }
-            ]
+        return _AGRI_MOCK_DATA
+    
+    def _process_agricultural_records(self, records: Iterator[Dict]) -> Dict:
+        """Adapt live market records to the agricultural data format"""
+        processed_data = {
+            "source": "Ministry of Agriculture & Farmers Welfare - data.gov.in (Live Market Data)",
+            "url": "https://data.gov.in/resource/current-daily-price-various-commodities-various-markets-mandis",
+            "data": []
         }
         
-        # Cache the mock data
-        with open(cache_file, 'w') as f:
-            json.dump(mock_data, f)
+        for record in records:
+            # This API returns market price data, not production data
+            # Let's adapt it to show market information as agricultural data
+            # Interned, so the many records sharing a label share one string and compare by identity
+            state_name = _label(record.get("state") or "Unknown")
+            district_name = _label(record.get("district") or "Unknown")
+            crop_name = _label(record.get("commodity") or "Unknown")
             
-        return mock_data
+            # Convert price data to estimated production info
+            modal_price = record.get("modal_price", "0")
+            price_val = _to_float(modal_price)
+            # Estimate production based on market activity (higher prices = lower production)
+            estimated_production = max(50000, 200000 - (price_val * 50)) if price_val > 0 else 100000
+            
+            processed_data["data"].append({
+                "state": state_name,
+                "district": district_name,
+                "crop": crop_name,
+                "production_tonnes": estimated_production,
+                "area_hectares": estimated_production / 2,  # Rough estimate
+                "year": 2025,  # Current data
+                "market_price": modal_price,
+                "data_type": "market_derived"
+            })
+        
+        return processed_data
     
     def get_climate_data(self, state: str = None, year: int = None) -> Dict:
         """Get real climate/rainfall data from data.gov.in"""
-        cache_key = f"climate_{state}_{year}".replace(" ", "_").lower() if state or year else "climate_all"
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        cache_file = self._cache_file("climate", state, year)
+        
+        # Try to fetch real rainfall data from data.gov.in
+        api_url = f"{self.api_base}/resource/{self.dataset_ids['rainfall_data']}"
+        params = {
+            "api-key": self.api_key,
+            "format": "json",
+            "limit": 100
+        }
+        
+        # Add filters if provided
+        if state:
+            params["filters[state]"] = state
+        if year:
+            params["filters[year]"] = str(year)
+        
+        def fetch(cached: Dict = None) -> Dict:
+            return self._fetch(api_url, params, cache_file, cached,
+                               lambda records: self._process_climate_records(records, year))
         
         # Check cache first (cache for 1 hour)
-        if os.path.exists(cache_file):
-            file_age = time.time() - os.path.getmtime(cache_file)
-            if file_age < 3600:  # 1 hour cache
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+        data = self._cached(cache_file, CACHE_DURATION_SECONDS, fetch, "real climate data", api_url)
+        if data is not None:
+            return data
         
-        try:
-            # Try to fetch real rainfall data from data.gov.in
-            api_url = f"{self.api_base}/resource/{self.dataset_ids['rainfall_data']}"
-            params = {
-                "api-key": self.api_key,
-                "format": "json",
-                "limit": 100
-            }
-            
-            # Add filters if provided
-            if state:
-                params["filters[state]"] = state
-            if year:
-                params["filters[year]"] = str(year)
-                
-            response = requests.get(api_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                api_data = response.json()
-                
-                # Process real data
-                processed_data = {
-                    "source": "India Meteorological Department - data.gov.in",
-                    "url": "https://data.gov.in/resource/district-wise-seasonal-and-annual-rainfall",
-                    "data": []
-                }
-                
-                if "records" in api_data:
-                    for record in api_data["records"]:
-                        processed_data["data"].append({
-                            "state": record.get("state", "Unknown"),
-                            "district": record.get("district", "Unknown"),
-                            "rainfall_mm": float(record.get("annual", 0)) if record.get("annual") else 0,
-                            "temperature_avg": float(record.get("temperature", 25.0)) if record.get("temperature") else 25.0,
-                            "year": int(record.get("year", year or 2023)),
-                            "month": "Annual"
-                        })
-                
-                # Cache the real data
-                with open(cache_file, 'w') as f:
-                    json.dump(processed_data, f)
-                    
-                return processed_data
-                
-        except Exception as e:
-            print(f"Error fetching real climate data: {e}")
+        # Fall back to the sample data (kept in memory only, like the agricultural sample)
+        mock_data = _climate_mock_data(year or 2023)
+        self._remember(cache_file, mock_data)
         
-        # Enhanced mock data with realistic Indian climate values for multiple states
-        mock_data = {
-            "source": "India Meteorological Department (Sample Data)",
+        return mock_data
+    
+    def _process_climate_records(self, records: Iterator[Dict], year: int = None) -> Dict:
+        """Normalize live rainfall records"""
+        processed_data = {
+            "source": "India Meteorological Department - data.gov.in",
             "url": "https://data.gov.in/resource/district-wise-seasonal-and-annual-rainfall",
-            "data": [
-                # Maharashtra
-                {
-                    "state": "Maharashtra",
-                    "district": "Pune", 
-                    "rainfall_mm": 722.0,
-                    "temperature_avg": 24.5,
-                    "year": year or 2023,
-                    "month": "Annual"
-                },
-                {
-                    "state": "Maharashtra",
-                    "district": "Mumbai",
-                    "rainfall_mm": 2167.0,
-                    "temperature_avg": 27.2,
-                    "year": year or 2023,
-                    "month": "Annual"
-                },
-                {
-                    "state": "Maharashtra",
-                    "district": "Nashik",
-                    "rainfall_mm": 508.0,
-                    "temperature_avg": 25.8,
-                    "year": year or 2023,
-                    "month": "Annual"
-                },
-                # Punjab
-                {
-                    "state": "Punjab",
-                    "district": "Ludhiana",
-                    "rainfall_mm": 709.0,
-                    "temperature_avg": 23.8,
-                    "year": year or 2023,
-                    "month": "Annual"
-                },
-                {
-                    "state": "Punjab",
-                    "district": "Amritsar",
-                    "rainfall_mm": 632.0,
-                    "temperature_avg": 24.1,
-                    "year": year or 2023,
-                    "month": "Annual"
-                },
-                # Other states
-                {
-                    "state": "Uttar Pradesh",
-                    "district": "Lucknow",
-                    "rainfall_mm": 896.0,
-                    "temperature_avg": 25.4,
-                    "year": year or 2023,
-                    "month": "Annual"
-                },
-                {
-                    "state": "Haryana",
-                    "district": "Gurgaon",
-                    "rainfall_mm": 553.0,
-                    "temperature_avg": 25.2,
-                    "year": year or 2023,
-                    "month": "Annual"
-                }
-            ]
+            "data": []
         }
         
-        # Cache the mock data
-        with open(cache_file, 'w') as f:
-            json.dump(mock_data, f)
-            
-        return mock_data
+        for record in records:
+            processed_data["data"].append({
+                "state": _label(record.get("state", "Unknown")),
+                "district": _label(record.get("district", "Unknown")),
+                "rainfall_mm": float(record.get("annual", 0)) if record.get("annual") else 0,
+                "temperature_avg": float(record.get("temperature", 25.0)) if record.get("temperature") else 25.0,
+                "year": int(record.get("year", year or 2023)),
+                "month": "Annual"
+            })
+        
+        return processed_data
     
     def get_market_prices(self, commodity: str = None, state: str = None) -> Dict:
         """Get current market prices from mandis"""
-        cache_key = f"prices_{commodity}_{state}".replace(" ", "_").lower() if commodity or state else "prices_all"
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
+        cache_file = self._cache_file("prices", commodity, state)
         
-        # Check cache first (cache for 30 minutes for price data)
-        if os.path.exists(cache_file):
-            file_age = time.time() - os.path.getmtime(cache_file)
-            if file_age < 1800:  # 30 minutes cache for prices
-                with open(cache_file, 'r') as f:
-                    return json.load(f)
+        # Try to fetch real market price data
+        api_url = f"{self.api_base}/resource/9ef84268-d588-465a-a308-a864a43d0070"
+        params = {
+            "api-key": "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b",
+            "format": "json",
+            "limit": 50
+        }
         
-        try:
-            # Try to fetch real market price data
-            api_url = f"{self.api_base}/resource/9ef84268-d588-465a-a308-a864a43d0070"
-            params = {
-                "api-key": "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b",
-                "format": "json",
-                "limit": 50
-            }
-            
-            response = requests.get(api_url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                api_data = response.json()
-                
-                processed_data = {
-                    "source": "Ministry of Agriculture & Farmers Welfare - Market Prices",
-                    "url": "https://data.gov.in/resource/current-daily-price-various-commodities-various-markets-mandis",
-                    "data": []
-                }
-                
-                # Process and cache real data
-                with open(cache_file, 'w') as f:
-                    json.dump(processed_data, f)
-                    
-                return processed_data
-                
-        except Exception as e:
-            print(f"Error fetching market price data: {e}")
+        def fetch(cached: Dict = None) -> Dict:
+            return self._fetch(api_url, params, cache_file, cached, self._process_market_price_records)
+        
+        # Check cache first (cache for 30 minutes for price data)
+        data = self._cached(cache_file, PRICE_CACHE_DURATION_SECONDS, fetch, "market price data", api_url)
+        if data is not None:
+            return data
         
         # Fallback mock data
-        mock_data = {
+        mock_data = self._mock_market_prices(commodity, state)
+        
+        self._remember(cache_file, mock_data)
+            
+        return mock_data
+    
+    def _mock_market_prices(self, commodity: str = None, state: str = None) -> Dict:
+        """Sample market price payload for when the API is unreachable"""
+        return {
             "source": "Ministry of Agriculture & Farmers Welfare - Market Prices (Sample)",
             "url": "https://data.gov.in/resource/current-daily-price-various-commodities-various-markets-mandis",
             "data": [
@@ -409,8 +741,88 @@ class DataScraper:
                 }
             ]
         }
+    
+    def _process_market_price_records(self, records: Iterator[Dict]) -> Dict:
+        """Build the market price payload; mandi records aren't mapped yet, so the body is never decoded"""
+        return {
+            "source": "Ministry of Agriculture & Farmers Welfare - Market Prices",
+            "url": "https://data.gov.in/resource/current-daily-price-various-commodities-various-markets-mandis",
+            "data": []
+        }
+    
+    def get_all(self, state: str = None, crop: str = None, year: int = None) -> Dict[str, Dict]:
+        """Fetch agricultural, climate and market price data concurrently"""
+        fetches = {
+            "agricultural": (self.get_agricultural_data, state, crop),
+            "climate": (self.get_climate_data, state, year),
+            "prices": (self.get_market_prices, crop, state)
+        }
         
-        with open(cache_file, 'w') as f:
-            json.dump(mock_data, f)
+        # The three sources are independent, so a cold cache costs max(t1, t2, t3) rather than the sum
+        with ThreadPoolExecutor(max_workers=len(fetches)) as executor:
+            futures = {executor.submit(fn, *args): key for key, (fn, *args) in fetches.items()}
+            return {futures[future]: future.result() for future in as_completed(futures)}
+    
+    # Async entry points. The cache, pacing and retry logic all live on the blocking path,
+    # so each call runs it in a worker thread and concurrent calls share the session's pool.
+    async def aget_agricultural_data(self, state: str = None, crop: str = None) -> Dict:
+        return await asyncio.to_thread(self.get_agricultural_data, state, crop)
+    
+    async def aget_climate_data(self, state: str = None, year: int = None) -> Dict:
+        return await asyncio.to_thread(self.get_climate_data, state, year)
+    
+    async def aget_market_prices(self, commodity: str = None, state: str = None) -> Dict:
+        return await asyncio.to_thread(self.get_market_prices, commodity, state)
+    
+    async def aget_state_bundle(self, state: str = None, crop: str = None, year: int = None) -> Dict[str, Dict]:
+        return await asyncio.to_thread(self.get_state_bundle, state, crop, year)
+    
+    def get_state_bundle(self, state: str = None, crop: str = None, year: int = None) -> Dict[str, Dict]:
+        """Fetch the same three sources as get_all with one request per distinct resource"""
+        # Production and market prices both come from the crop_production resource,
+        # so a cold cache costs two requests here instead of three
+        agri_file = self._cache_file("agri", state, crop)
+        prices_file = self._cache_file("prices", crop, state)
+        api_url = f"{self.api_base}/resource/{self.dataset_ids['crop_production']}"
+        params = {
+            "api-key": self.api_key,
+            "format": "json",
+            "limit": 100
+        }
+        
+        # Whichever of the two entries misses first makes the request, and the other reuses
+        # its result, even when that request failed. The miss may come from _cached's
+        # background revalidation, so the other entry waits on the lock rather than
+        # reading a result that isn't there yet.
+        shared = {}
+        shared_lock = threading.Lock()
+        
+        def fetch(cache_file: str) -> Callable[[Optional[Dict]], Optional[Dict]]:
+            def fetch_entry(cached: Dict = None) -> Optional[Dict]:
+                with shared_lock:
+                    if "payloads" not in shared:
+                        shared["payloads"] = {}
+                        shared["payloads"] = self._fetch_shared(api_url, params, [
+                            (agri_file, 100, self._process_agricultural_records),
+                            (prices_file, 50, self._process_market_price_records)
+                        ])
+                    return shared["payloads"].get(cache_file)
+            return fetch_entry
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Climate lives in its own resource, so its request overlaps the shared one
+            climate = executor.submit(self.get_climate_data, state, year)
+            
+            agricultural = self._cached(agri_file, CACHE_DURATION_SECONDS, fetch(agri_file), "real agricultural data",
+                                        api_url)
+            if agricultural is None:
+                agricultural = _AGRI_MOCK_DATA
+                self._remember(agri_file, agricultural)
+            
+            prices = self._cached(prices_file, PRICE_CACHE_DURATION_SECONDS, fetch(prices_file), "market price data",
+                                  api_url)
+            if prices is None:
+                prices = self._mock_market_prices(crop, state)
+                self._remember(prices_file, prices)
             
-        return mock_data
\ No newline at end of file
+            return {"agricultural": agricultural, "climate": climate.result(), "prices": prices}
\ No newline at end of file
@@ -1,8 +1,54 @@
 import json
-import statistics
+import math
+import operator
+import re
+from array import array
+from dataclasses import dataclass
+from itertools import repeat
 from typing import Dict, List, Any, Tuple
 from datetime import datetime, timedelta
 
+# Source tags that say how fresh a dataset is, matched case-insensitively in one pass
+_FRESH_RE = re.compile(r'live|real-time|sample', re.I)
+_FRESH_MAP = {"live": 1.0, "real-time": 1.0, "sample": 0.7}
+
+# Marks a field a record does not have, so callers can choose their own default
+_MISSING = object()
+
+class RecordColumns:
+    """Columnar view of a list of records that pulls each field out at most once"""
+    
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self._columns: Dict[str, List[Any]] = {}
+        
+    def __len__(self) -> int:
+        return len(self.records)
+        
+    def column(self, field: str, default: Any = None) -> List[Any]:
+        """One field across every record, with default standing in where a record lacks it"""
+        values = self._columns.get(field)
+        if values is None:
+            # map(dict.get) runs the loop in C
+            values = self._columns[field] = list(map(dict.get, self.records, repeat(field), repeat(_MISSING)))
+        if _MISSING not in values:
+            return values
+        return [default if value is _MISSING else value for value in values]
+        
+    def present_count(self, field: str) -> int:
+        """Count the records with a non-empty value for a field"""
+        values = self.column(field)
+        return len(values) - values.count(None) - values.count("")
+
+@dataclass
+class RecordScan:
+    """Partial results gathered in a single pass over a list of records"""
+    record_count: int
+    present_fields: int
+    total_fields: int
+    duplicates: int
+    values: array
+
 class DataValidator:
     """
     Data quality validation and scoring system
@@ -31,17 +77,21 @@ class DataValidator:
             validation_result["issues"].append("No data records found")
             return validation_result
             
-        records = data["data"]
+        columns = RecordColumns(data["data"])
+        
+        # Gather completeness, duplicate and production figures in one pass
+        scan = self._scan(columns, 
+            required_fields=["state", "district", "crop", "production_tonnes"],
+            numeric_field="production_tonnes")
         
         # Check completeness
-        completeness_score = self._check_completeness(records, 
-            required_fields=["state", "district", "crop", "production_tonnes"])
+        completeness_score = scan.present_fields / scan.total_fields if scan.total_fields > 0 else 0.0
         
         # Check consistency
-        consistency_score = self._check_consistency(records)
+        consistency_score = 1.0 if scan.record_count < 2 else max(0.0, 1.0 - (scan.duplicates / scan.record_count))
         
         # Check for outliers
-        outlier_score = self._check_outliers(records, "production_tonnes")
+        outlier_score = self._outlier_score(scan.values)
         
         # Check data freshness
         freshness_score = self._check_freshness(data)
@@ -81,32 +131,31 @@ class DataValidator:
             return validation_result
             
         records = data["data"]
+        columns = RecordColumns(records)
+        
+        districts = columns.column("district", "Unknown")
         
         # Check for reasonable rainfall values (0-5000mm annually)
-        rainfall_issues = []
-        for record in records:
-            rainfall = record.get("rainfall_mm", 0)
-            if rainfall < 0 or rainfall > 5000:
-                rainfall_issues.append(f"Unusual rainfall: {rainfall}mm in {record.get('district', 'Unknown')}")
+        rainfall_issues = [f"Unusual rainfall: {rainfall}mm in {district}"
+                           for rainfall, district in zip(columns.column("rainfall_mm", 0), districts)
+                           if rainfall < 0 or rainfall > 5000]
                 
         if rainfall_issues:
             validation_result["issues"].extend(rainfall_issues)
             
         # Check temperature ranges (5-50°C for India)
-        temp_issues = []
-        for record in records:
-            temp = record.get("temperature_avg", 25)
-            if temp < 5 or temp > 50:
-                temp_issues.append(f"Unusual temperature: {temp}°C in {record.get('district', 'Unknown')}")
+        temp_issues = [f"Unusual temperature: {temp}°C in {district}"
+                       for temp, district in zip(columns.column("temperature_avg", 25), districts)
+                       if temp < 5 or temp > 50]
                 
         if temp_issues:
             validation_result["issues"].extend(temp_issues)
             
         # Calculate quality score
-        completeness_score = self._check_completeness(records, 
+        completeness_score = self._check_completeness(columns, 
             required_fields=["state", "district", "rainfall_mm", "temperature_avg"])
         
-        data_quality = 1.0 - (len(rainfall_issues + temp_issues) / max(len(records), 1))
+        data_quality = 1.0 - ((len(rainfall_issues) + len(temp_issues)) / max(len(records), 1))
         
         validation_result["quality_score"] = (completeness_score + data_quality) / 2
         
@@ -133,8 +182,9 @@ class DataValidator:
             return validation_result
             
         # Check geographic alignment
-        agri_states = set(record.get("state", "").lower() for record in agri_data["data"])
-        climate_states = set(record.get("state", "").lower() for record in climate_data["data"])
+        # Dedupe before lowercasing so .lower() runs once per distinct state, not once per record
+        agri_states = set(map(str.lower, set(RecordColumns(agri_data["data"]).column("state", ""))))
+        climate_states = set(map(str.lower, set(RecordColumns(climate_data["data"]).column("state", ""))))
         
         common_states = agri_states.intersection(climate_states)
         total_states = agri_states.union(climate_states)
@@ -155,76 +205,63 @@ class DataValidator:
             
         return validation_result
         
-    def _check_completeness(self, records: List[Dict], required_fields: List[str]) -> float:
+    def _scan(self, columns: RecordColumns, required_fields: List[str], numeric_field: str) -> RecordScan:
+        """Collect completeness, duplicate and numeric-value aggregates from columnar views of the records"""
+        present_fields = sum(map(columns.present_count, required_fields))
+        
+        # Only the 64-bit hash of each (state, district, crop) combination is kept, not the tuple of strings
+        unique_combinations = set(map(hash, zip(columns.column("state", ""), columns.column("district", ""),
+                                                columns.column("crop", ""))))
+        
+        values = array('d', (value for value in columns.column(numeric_field)
+                             if isinstance(value, (int, float)) and value > 0))
+        
+        return RecordScan(
+            record_count=len(columns),
+            present_fields=present_fields,
+            total_fields=len(columns) * len(required_fields),
+            duplicates=len(columns) - len(unique_combinations),
+            values=values
+        )
+        
+    def _check_completeness(self, columns: RecordColumns, required_fields: List[str]) -> float:
         """Check data completeness score"""
-        if not records:
+        if not columns:
             return 0.0
             
-        total_fields = len(records) * len(required_fields)
-        present_fields = 0
-        
-        for record in records:
-            for field in required_fields:
-                if record.get(field) is not None and record.get(field) != "":
-                    present_fields += 1
+        total_fields = len(columns) * len(required_fields)
+        present_fields = sum(map(columns.present_count, required_fields))
                     
         return present_fields / total_fields if total_fields > 0 else 0.0
         
-    def _check_consistency(self, records: List[Dict]) -> float:
-        """Check data consistency across records"""
-        if len(records) < 2:
+    def _outlier_score(self, values) -> float:
+        """Share of values within three standard deviations of the mean"""
+        count = len(values)
+        if count < 3:
             return 1.0
             
-        # Check for duplicate entries
-        seen_combinations = set()
-        duplicates = 0
-        
-        for record in records:
-            key = (record.get("state", ""), record.get("district", ""), record.get("crop", ""))
-            if key in seen_combinations:
-                duplicates += 1
-            seen_combinations.add(key)
-            
-        consistency_score = 1.0 - (duplicates / len(records))
-        return max(0.0, consistency_score)
-        
-    def _check_outliers(self, records: List[Dict], field: str) -> float:
-        """Check for statistical outliers in numerical data"""
-        values = []
-        for record in records:
-            value = record.get(field)
-            if isinstance(value, (int, float)) and value > 0:
-                values.append(value)
+        # Every loop below runs inside C builtins (fsum, map, sum) rather than Python bytecode.
+        # statistics.mean/stdev would go through exact Fractions and are far slower.
+        # The variance sums squared deviations from the mean; the one-pass sum-of-squares form
+        # cancels badly on near-constant columns and flags every value as an outlier.
+        mean_val = math.fsum(values) / count
+        deviations = list(map(abs, map(mean_val.__rsub__, values)))
+        variance = math.fsum(map(operator.mul, deviations, deviations)) / (count - 1)
+        
+        limit = 3 * math.sqrt(variance)  # 3-sigma rule
+        outliers = sum(map(limit.__lt__, deviations))
                 
-        if len(values) < 3:
-            return 1.0
-            
-        try:
-            mean_val = statistics.mean(values)
-            stdev_val = statistics.stdev(values)
-            
-            outliers = 0
-            for value in values:
-                if abs(value - mean_val) > 3 * stdev_val:  # 3-sigma rule
-                    outliers += 1
-                    
-            outlier_score = 1.0 - (outliers / len(values))
-            return max(0.0, outlier_score)
-            
-        except statistics.StatisticsError:
-            return 1.0
+        outlier_score = 1.0 - (outliers / count)
+        return max(0.0, outlier_score)
             
     def _check_freshness(self, data: Dict) -> float:
         """Check data freshness based on last update"""
         # For now, assume data is reasonably fresh
         # In production, would check actual timestamps
+        # Mock data is less fresh but still useful; a live tag wins over a sample tag,
+        # and untagged sources get a default reasonable freshness
         source = data.get("source", "")
-        if "live" in source.lower() or "real-time" in source.lower():
-            return 1.0
-        elif "sample" in source.lower():
-            return 0.7  # Mock data is less fresh but still useful
-        else:
-            return 0.8  # Default reasonable freshness
+        return max((_FRESH_MAP[match.group().lower()] for match in _FRESH_RE.finditer(source)), default=0.8)
             
     def generate_quality_report(self, agri_validation: Dict, climate_validation: Dict, 
                               cross_validation: Dict) -> str:
@@ -1,5 +1,5 @@
-from data_scraper import DataScraper
-import requests
+from data_scraper import DataScraper, iter_records
+import sys
 
 ds = DataScraper()
 url = f"{ds.api_base}/resource/{ds.dataset_ids['crop_production']}"
@@ -13,15 +13,19 @@ print("Testing API call...")
 print(f"URL: {url}")
 print(f"Params: {params}")
 
-r = requests.get(url, params=params)
+# Reuse the scraper's pooled session and stream the body instead of decoding it all
+r = ds.session.get(url, params=params, timeout=10, stream=True)
 print(f"Status: {r.status_code}")
 
 if r.status_code == 200:
-    data = r.json()
-    print(f"Response keys: {list(data.keys())}")
-    records = data.get('records', [])
-    print(f"Records found: {len(records)}")
-    if records:
-        print(f"Sample record: {records[0]}")
+    records = iter_records(r)
+    first_record = next(records, None)
+    if first_record:
+        print(f"Record keys: {list(first_record.keys())}")
+        print(f"Sample record: {first_record}")
+    if "--count" in sys.argv:
+        # Counting means reading the rest of the body, so only do it when asked
+        print(f"Records found: {sum(1 for _ in records) + 1 if first_record else 0}")
+    records.close()
 else:
     print(f"Error: {r.text}")
\ No newline at end of file
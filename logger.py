@@ -1,10 +1,82 @@
 import logging
+import logging.handlers
+import atexit
+import itertools
 import json
+import queue
+import secrets
+import shutil
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, fields
 import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import os
 
+# Audit entries kept in memory; older ones are dropped as new ones arrive
+AUDIT_LOG_MAX_ENTRIES = 10000
+
+# Span covered by the health report
+HEALTH_WINDOW_SECONDS = 3600
+
+# Append-only audit trail, one JSON line per entry, rotated into numbered segments by size
+AUDIT_TRAIL_FILE = 'samarth_audit.jsonl'
+AUDIT_SEGMENT_BYTES = 10 * 1024 * 1024
+AUDIT_SEGMENT_COUNT = 5
+
+# Last (second, ISO string) pair handed out by _iso_now
+_iso_cache = (0, "")
+
+def _iso_now(now: float = None) -> str:
+    """Local time as an ISO string to the second, formatted at most once per second"""
+    global _iso_cache
+    second = int(time.time() if now is None else now)
+    cached = _iso_cache
+    if cached[0] != second:
+        cached = _iso_cache = (second, datetime.fromtimestamp(second).isoformat())
+    return cached[1]
+
+def _compact_json(obj: Any) -> bytes:
+    """Serialise without indentation or ASCII escaping; the export is for machines"""
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+@dataclass(slots=True)
+class QueryEntry:
+    """One logged query; t is the monotonic stamp used for time windows and is never exported"""
+    timestamp: str
+    question: str
+    entities_extracted: Dict
+    data_sources_used: list
+    response_time_ms: float
+    success: bool
+    session_id: str
+    t: float
+    error_type: Optional[str] = None
+
+@dataclass(slots=True)
+class SourceEntry:
+    """One logged data source access; t as in QueryEntry"""
+    timestamp: str
+    source_type: str
+    url: str
+    success: bool
+    record_count: int
+    cache_hit: bool
+    response_time: float
+    t: float
+
+def _public(entry) -> Dict:
+    """Turn an entry into the dict handed out by the logger, without the internal monotonic stamp"""
+    return {field.name: getattr(entry, field.name) for field in fields(entry) if field.name != "t"}
+
+class _AuditFormatter(logging.Formatter):
+    """Render an audit record as one compact JSON line; runs on the listener thread"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({"kind": record.audit_kind, **_public(record.audit_entry)},
+                          separators=(",", ":"), ensure_ascii=False)
+
 class SamarthLogger:
     """
     Comprehensive logging system for Project Samarth
@@ -13,104 +85,239 @@ class SamarthLogger:
     
     def __init__(self):
         self.setup_logging()
-        self.query_log = []
-        self.data_source_log = []
+        self.query_log = deque(maxlen=AUDIT_LOG_MAX_ENTRIES)
+        self.data_source_log = deque(maxlen=AUDIT_LOG_MAX_ENTRIES)
+        
+        # Rolling health aggregates: updated as entries are logged and as they age out of the
+        # window, so a health check only touches entries that expired since the last one
+        self._window_lock = threading.Lock()
+        self._query_window = deque()
+        self._query_successes = 0
+        self._response_time_sum = 0.0
+        self._source_window = deque()
+        self._source_types = Counter()
+        self._cache_hits = 0
+        self._records_sum = 0
         
     def setup_logging(self):
         """Setup structured logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('samarth.log'),
-                logging.StreamHandler()
-            ]
-        )
+        # Log calls only enqueue the record; a listener thread formats it and does the file and
+        # console I/O, so logging from async request handlers never blocks the event loop
+        root = logging.getLogger()
+        self.listener = None
+        
+        # Audit entries go to their own append-only trail rather than the text log
+        self.audit_handler = logging.handlers.RotatingFileHandler(
+            AUDIT_TRAIL_FILE, maxBytes=AUDIT_SEGMENT_BYTES, backupCount=AUDIT_SEGMENT_COUNT,
+            encoding='utf-8', delay=True)
+        self.audit_handler.setFormatter(_AuditFormatter())
+        self.audit_handler.addFilter(logging.Filter('Samarth.audit'))
+        self.audit_logger = logging.getLogger('Samarth.audit')
+        self.audit_logger.setLevel(logging.INFO)
+        self.audit_logger.propagate = False
+        
+        if not root.handlers:  # Leave an already configured root logger alone, like basicConfig
+            formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+            handlers = [logging.FileHandler('samarth.log'), logging.StreamHandler()]
+            for handler in handlers:
+                handler.setFormatter(formatter)
+                handler.addFilter(lambda record: record.name != 'Samarth.audit')
+            
+            # One listener thread serves both; each handler's filter picks its own records
+            log_queue = queue.SimpleQueue()
+            self.listener = logging.handlers.QueueListener(log_queue, *handlers, self.audit_handler,
+                                                           respect_handler_level=True)
+            self.listener.start()
+            atexit.register(self.listener.stop)
+            
+            root.setLevel(logging.INFO)
+            root.addHandler(logging.handlers.QueueHandler(log_queue))
+            self.audit_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        else:
+            self.audit_logger.addHandler(self.audit_handler)
         self.logger = logging.getLogger('Samarth')
+        self._export_lock = threading.Lock()
         
     def log_query(self, question: str, entities: Dict, data_sources: list, response_time: float, success: bool):
         """Log user query with full traceability"""
-        query_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "question": question,
-            "entities_extracted": entities,
-            "data_sources_used": data_sources,
-            "response_time_ms": response_time * 1000,
-            "success": success,
-            "session_id": self._get_session_id()
-        }
+        self._record_query(question, entities, data_sources, response_time, success)
+        self.logger.info("Query processed: %s... | Sources: %d | Time: %.2fs", question[:50], len(data_sources), response_time)
+        
+    def log_query_result(self, question: str, entities: Dict, data_sources: list, response_time: float,
+                         error_type: str = None, error: str = None):
+        """Log a finished query as one entry; a failed query carries its error instead of a separate error record"""
+        if error_type is None:
+            self.log_query(question, entities, data_sources, response_time, True)
+            return
+        
+        self._record_query(question, entities, data_sources, response_time, False, error_type)
+        self.logger.error("Query failed [%s]: %s | Question: %s... | Time: %.2fs",
+                          error_type, error, question[:50], response_time)
+        
+    def _record_query(self, question: str, entities: Dict, data_sources: list, response_time: float,
+                      success: bool, error_type: str = None):
+        """Add a query entry to the buffer, the health aggregates and the audit trail"""
+        query_entry = QueryEntry(
+            timestamp=_iso_now(),
+            question=question,
+            entities_extracted=entities,
+            data_sources_used=data_sources,
+            response_time_ms=response_time * 1000,
+            success=success,
+            session_id=self._get_session_id(),
+            t=time.monotonic(),
+            error_type=error_type
+        )
         
         self.query_log.append(query_entry)
-        self.logger.info(f"Query processed: {question[:50]}... | Sources: {len(data_sources)} | Time: {response_time:.2f}s")
+        with self._window_lock:
+            self._add_query(query_entry)
+        self.audit_logger.info("query", extra={"audit_kind": "query", "audit_entry": query_entry})
         
     def log_data_source_access(self, source_type: str, url: str, success: bool, record_count: int, cache_hit: bool):
         """Log data source access for audit trail"""
-        source_entry = {
-            "timestamp": datetime.now().isoformat(),
-            "source_type": source_type,
-            "url": url,
-            "success": success,
-            "record_count": record_count,
-            "cache_hit": cache_hit,
-            "response_time": time.time()
-        }
+        now = time.time()
+        source_entry = SourceEntry(
+            timestamp=_iso_now(now),
+            source_type=source_type,
+            url=url,
+            success=success,
+            record_count=record_count,
+            cache_hit=cache_hit,
+            response_time=now,
+            t=time.monotonic()
+        )
         
         self.data_source_log.append(source_entry)
-        status = "SUCCESS" if success else "FAILED"
-        cache_status = "CACHE" if cache_hit else "API"
-        self.logger.info(f"Data access [{status}] {source_type} via {cache_status}: {record_count} records")
+        with self._window_lock:
+            self._add_source(source_entry)
+        self.audit_logger.info("data_source", extra={"audit_kind": "data_source", "audit_entry": source_entry})
+        self.logger.info("Data access [%s] %s via %s: %s records", "SUCCESS" if success else "FAILED",
+                         source_type, "CACHE" if cache_hit else "API", record_count)
         
     def log_error(self, error_type: str, message: str, context: Dict = None):
         """Log errors with context for debugging"""
         error_entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _iso_now(),
             "error_type": error_type,
             "message": message,
             "context": context or {}
         }
         
-        self.logger.error(f"Error [{error_type}]: {message}")
-        if context:
-            self.logger.error(f"Context: {json.dumps(context, indent=2)}")
+        # Arguments are only formatted if a handler takes the record; the context dump is skipped
+        # outright when errors are filtered, and kept on one line for log parsers
+        self.logger.error("Error [%s]: %s", error_type, message)
+        if context and self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error("Context: %s", json.dumps(context))
             
     def get_system_health(self) -> Dict[str, Any]:
         """Generate system health report"""
-        recent_queries = [q for q in self.query_log if 
-                         (datetime.now() - datetime.fromisoformat(q["timestamp"])).seconds < 3600]
-        
-        recent_sources = [s for s in self.data_source_log if 
-                         (datetime.now() - datetime.fromisoformat(s["timestamp"])).seconds < 3600]
-        
-        return {
-            "queries_last_hour": len(recent_queries),
-            "success_rate": sum(1 for q in recent_queries if q["success"]) / max(len(recent_queries), 1),
-            "avg_response_time": sum(q["response_time_ms"] for q in recent_queries) / max(len(recent_queries), 1),
-            "data_sources_accessed": len(set(s["source_type"] for s in recent_sources)),
-            "cache_hit_rate": sum(1 for s in recent_sources if s["cache_hit"]) / max(len(recent_sources), 1),
-            "total_records_processed": sum(s["record_count"] for s in recent_sources)
-        }
+        with self._window_lock:
+            self._expire(time.monotonic() - HEALTH_WINDOW_SECONDS)
+            queries = len(self._query_window)
+            sources = len(self._source_window)
+            
+            return {
+                "queries_last_hour": queries,
+                "success_rate": self._query_successes / max(queries, 1),
+                "avg_response_time": self._response_time_sum / max(queries, 1),
+                "data_sources_accessed": len(self._source_types),
+                "cache_hit_rate": self._cache_hits / max(sources, 1),
+                "total_records_processed": self._records_sum
+            }
+        
+    def _add_query(self, entry: QueryEntry):
+        """Count a query into the rolling aggregates"""
+        if len(self._query_window) == AUDIT_LOG_MAX_ENTRIES:  # Evict alongside the ring buffer
+            self._drop_query()
+        self._query_window.append(entry)
+        if entry.success:
+            self._query_successes += 1
+        self._response_time_sum += entry.response_time_ms
+        
+    def _drop_query(self):
+        """Remove the oldest query from the rolling aggregates"""
+        entry = self._query_window.popleft()
+        if entry.success:
+            self._query_successes -= 1
+        self._response_time_sum -= entry.response_time_ms
+        if not self._query_window:
+            self._response_time_sum = 0.0  # Shed accumulated float error
+            
+    def _add_source(self, entry: SourceEntry):
+        """Count a data source access into the rolling aggregates"""
+        if len(self._source_window) == AUDIT_LOG_MAX_ENTRIES:
+            self._drop_source()
+        self._source_window.append(entry)
+        self._source_types[entry.source_type] += 1
+        if entry.cache_hit:
+            self._cache_hits += 1
+        self._records_sum += entry.record_count
+        
+    def _drop_source(self):
+        """Remove the oldest data source access from the rolling aggregates"""
+        entry = self._source_window.popleft()
+        self._source_types[entry.source_type] -= 1
+        if not self._source_types[entry.source_type]:
+            del self._source_types[entry.source_type]
+        if entry.cache_hit:
+            self._cache_hits -= 1
+        self._records_sum -= entry.record_count
+        
+    def _expire(self, cutoff: float):
+        """Age entries logged before the cutoff out of the rolling aggregates"""
+        while self._query_window and self._query_window[0].t < cutoff:
+            self._drop_query()
+        while self._source_window and self._source_window[0].t < cutoff:
+            self._drop_source()
+        
+    def recent_queries(self, count: int = 10) -> list:
+        """Return the last few queries, oldest first"""
+        return [_public(q) for q in itertools.islice(reversed(self.query_log), count)][::-1]
         
     def _get_session_id(self) -> str:
         """Generate session ID for tracking"""
-        return f"session_{int(time.time())}"
+        # 64 random bits: unlike the clock, distinct for every query logged in the same second
+        return f"session_{secrets.token_hex(8)}"
         
     def export_audit_log(self, filepath: str):
         """Export complete audit log for compliance"""
-        audit_data = {
-            "export_timestamp": datetime.now().isoformat(),
-            "system_info": {
-                "version": "1.0.0",
-                "deployment": "development"
-            },
-            "queries": self.query_log,
-            "data_sources": self.data_source_log,
-            "health_metrics": self.get_system_health()
-        }
-        
-        with open(filepath, 'w') as f:
-            json.dump(audit_data, f, indent=2)
+        with self._export_lock:
+            # Restarting the listener drains the queue, so every entry logged so far is on disk
+            if self.listener is not None:
+                self.listener.stop()
+                self.listener.start()
+                
+            header = {
+                "export_timestamp": datetime.now().isoformat(),
+                "system_info": {
+                    "version": "1.0.0",
+                    "deployment": "development"
+                },
+                "health_metrics": self.get_system_health()
+            }
             
-        self.logger.info(f"Audit log exported to {filepath}")
+            # The export is the summary line followed by a straight copy of the trail segments,
+            # oldest first. Holding the handler lock stops a rotation from renaming them mid-copy.
+            tmp_path = f"{filepath}.tmp"
+            self.audit_handler.acquire()
+            try:
+                with open(tmp_path, 'wb') as out:
+                    out.write(_compact_json(header) + b"\n")
+                    for segment in self._audit_segments():
+                        with open(segment, 'rb') as f:
+                            shutil.copyfileobj(f, out, 1 << 20)
+            finally:
+                self.audit_handler.release()
+            os.replace(tmp_path, filepath)
+            
+        self.logger.info("Audit log exported to %s", filepath)
+        
+    def _audit_segments(self) -> list:
+        """Paths of the audit trail segments on disk, oldest first"""
+        base = self.audit_handler.baseFilename
+        segments = [f"{base}.{i}" for i in range(AUDIT_SEGMENT_COUNT, 0, -1)] + [base]
+        return [segment for segment in segments if os.path.exists(segment)]
 
 # Global logger instance
 samarth_logger = SamarthLogger()
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
@@ -23,25 +23,29 @@ query_processor = QueryProcessor()
 class QueryRequest(BaseModel):
     question: str
 
+@app.middleware("http")
+async def start_request_timer(request: Request, call_next):
+    # Handlers time themselves from this one monotonic reading
+    request.state.t0 = time.monotonic()
+    return await call_next(request)
+
 @app.get("/")
 async def read_root():
     return FileResponse("static/index.html")
 
 @app.post("/api/query")
-async def process_query(request: QueryRequest):
-    start_time = time.time()
+async def process_query(request: QueryRequest, http_request: Request):
     try:
         # Process the natural language query with full logging
         result = await query_processor.process_question(request.question)
         
         # Log successful query
-        response_time = time.time() - start_time
-        samarth_logger.log_query(
+        response_time = time.monotonic() - http_request.state.t0
+        samarth_logger.log_query_result(
             question=request.question,
             entities=result.get("entities", {}),
             data_sources=result.get("sources", []),
-            response_time=response_time,
-            success=True
+            response_time=response_time
         )
         
         return {
@@ -51,15 +55,15 @@ async def process_query(request: QueryRequest):
             "response_time": f"{response_time:.2f}s"
         }
     except Exception as e:
-        # Log failed query
-        response_time = time.time() - start_time
-        samarth_logger.log_error("query_processing", str(e), {"question": request.question})
-        samarth_logger.log_query(
+        # Log failed query, error included, as a single entry
+        response_time = time.monotonic() - http_request.state.t0
+        samarth_logger.log_query_result(
             question=request.question,
             entities={},
             data_sources=[],
             response_time=response_time,
-            success=False
+            error_type="query_processing",
+            error=str(e)
         )
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -81,7 +85,7 @@ async def get_audit_log():
     """Export audit log for compliance and monitoring"""
     return {
         "system_health": samarth_logger.get_system_health(),
-        "recent_queries": samarth_logger.query_log[-10:],  # Last 10 queries
+        "recent_queries": samarth_logger.recent_queries(10),  # Last 10 queries
         "data_quality": "See individual query responses for detailed quality reports"
     }
 
@@ -1,15 +1,52 @@
+import asyncio
 import json
 import re
-from typing import Dict, List, Any
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Callable
+from config import QUERY_CACHE_TTL_SECONDS
 from data_scraper import DataScraper
 from logger import samarth_logger
 from data_validator import data_validator
 
+# Enhanced state detection
+STATES = ["Maharashtra", "Punjab", "Haryana", "Uttar Pradesh", "Bihar", 
+          "West Bengal", "Gujarat", "Rajasthan", "Karnataka", "Tamil Nadu",
+          "Andhra Pradesh", "Telangana", "Kerala", "Odisha", "Madhya Pradesh"]
+
+# Enhanced crop detection
+CROPS = ["rice", "wheat", "cotton", "sugarcane", "maize", "bajra", 
+         "jowar", "pulses", "oilseeds", "groundnut", "soybean", "mustard",
+         "barley", "gram", "tur", "moong", "urad", "brinjal", "potato", "tomato"]
+
+# Canonical spelling for each lowercased match
+STATE_CANON = {state.lower(): state for state in STATES}
+CROP_CANON = {crop.lower(): crop.title() for crop in CROPS}
+
 class QueryProcessor:
     def __init__(self):
         self.data_scraper = DataScraper()
         # OpenAI integration can be added later if needed
         
+        # Recent data source responses, as (fetched at, data), and a lock per source so
+        # concurrent queries that miss wait for one fetch instead of each hitting upstream
+        self._cache: Dict[str, tuple] = {}
+        self._cache_locks: Dict[str, asyncio.Lock] = {}
+        
+        # One precompiled alternation per entity type, so extraction is a single regex pass each.
+        # Word boundaries stop "rice" matching inside "price" and "tur" inside "temperature";
+        # crops may be followed by a plural ending ("potatoes").
+        self._state_re = re.compile(r'\b(' + '|'.join(map(re.escape, STATES)) + r')\b', re.IGNORECASE)
+        self._crop_re = re.compile(r'\b(' + '|'.join(map(re.escape, CROPS)) + r')(?:e?s)?\b', re.IGNORECASE)
+        self._year_re = re.compile(r'\b(?:19|20)\d{2}\b')
+        
+        # Keyword checks keep their substring semantics ("crops" still says "crop")
+        self._comparison_re = re.compile(r'compare|vs|versus|between', re.IGNORECASE)
+        self._agri_re = re.compile(r'production|crop|yield|farming|agriculture|harvest|cultivation', re.IGNORECASE)
+        self._climate_re = re.compile(r'rainfall|temperature|climate|weather|monsoon|precipitation', re.IGNORECASE)
+        self._trend_re = re.compile(r'trend|over time|decade|years|pattern', re.IGNORECASE)
+        self._correlation_re = re.compile(r'correlate|relationship|impact|effect', re.IGNORECASE)
+        
     async def process_question(self, question: str) -> Dict[str, Any]:
         """Process a natural language question and return structured answer"""
         
@@ -27,7 +64,7 @@ class QueryProcessor:
             quality_assessment = self.assess_data_quality(relevant_data)
             
             # Generate answer with quality information
-            answer = self.generate_answer(question, relevant_data, quality_assessment)
+            answer = self.generate_answer(question, relevant_data, quality_assessment, entities)
             
             return {
                 "answer": answer["text"],
@@ -53,31 +90,15 @@ class QueryProcessor:
             "districts": []
         }
         
-        # Extract years
-        year_pattern = r'\b(19|20)\d{2}\b'
-        entities["years"] = re.findall(year_pattern, question)
-        
-        # Enhanced state detection
-        states = ["Maharashtra", "Punjab", "Haryana", "Uttar Pradesh", "Bihar", 
-                 "West Bengal", "Gujarat", "Rajasthan", "Karnataka", "Tamil Nadu",
-                 "Andhra Pradesh", "Telangana", "Kerala", "Odisha", "Madhya Pradesh"]
-        
-        question_lower = question.lower()
-        for state in states:
-            if state.lower() in question_lower:
-                entities["states"].append(state)
-        
-        # Enhanced crop detection
-        crops = ["rice", "wheat", "cotton", "sugarcane", "maize", "bajra", 
-                "jowar", "pulses", "oilseeds", "groundnut", "soybean", "mustard",
-                "barley", "gram", "tur", "moong", "urad", "brinjal", "potato", "tomato"]
+        # Extract years (whole years; the group used to capture only the century)
+        entities["years"] = self._year_re.findall(question)
         
-        for crop in crops:
-            if crop.lower() in question_lower:
-                entities["crops"].append(crop.title())
+        # Mentions in the order they appear, each entity listed once
+        entities["states"] = list(dict.fromkeys(STATE_CANON[match.lower()] for match in self._state_re.findall(question)))
+        entities["crops"] = list(dict.fromkeys(CROP_CANON[match.lower()] for match in self._crop_re.findall(question)))
         
         # Detect comparison requests
-        if any(word in question_lower for word in ["compare", "vs", "versus", "between"]):
+        if self._comparison_re.search(question):
             entities["comparison"] = True
         
         return entities
@@ -96,46 +117,65 @@ class QueryProcessor:
         }
         
         # Check if agricultural data is needed
-        agri_keywords = ["production", "crop", "yield", "farming", "agriculture", "harvest", "cultivation"]
-        if any(keyword in question.lower() for keyword in agri_keywords):
+        if self._agri_re.search(question):
             requirements["needs_agricultural_data"] = True
         
         # Check if climate data is needed
-        climate_keywords = ["rainfall", "temperature", "climate", "weather", "monsoon", "precipitation"]
-        if any(keyword in question.lower() for keyword in climate_keywords):
+        if self._climate_re.search(question):
             requirements["needs_climate_data"] = True
         
         # Determine comparison type
-        if "compare" in question.lower() or "vs" in question.lower() or " and " in question.lower():
+        question_lower = question.lower()
+        if "compare" in question_lower or "vs" in question_lower or " and " in question_lower:
             requirements["comparison_type"] = "comparison"
         
         # Check for trend analysis
-        if any(word in question.lower() for word in ["trend", "over time", "decade", "years", "pattern"]):
+        if self._trend_re.search(question):
             requirements["analysis_type"] = "trend"
         
         # Check for correlation analysis
-        if any(word in question.lower() for word in ["correlate", "relationship", "impact", "effect"]):
+        if self._correlation_re.search(question):
             requirements["analysis_type"] = "correlation"
         
         return requirements
     
     async def fetch_relevant_data(self, requirements: Dict) -> Dict:
         """Fetch data based on requirements"""
-        data = {}
+        # The sources are independent, so they are fetched concurrently
+        tasks = {}
         
         if requirements["needs_agricultural_data"]:
             # Just fetch general agricultural data - filtering will happen in generate_answer
-            data["agricultural"] = self.data_scraper.get_agricultural_data()
+            tasks["agricultural"] = self._cached("agri", self.data_scraper.get_agricultural_data)
         
         if requirements["needs_climate_data"]:
             # Just fetch general climate data - filtering will happen in generate_answer  
-            data["climate"] = self.data_scraper.get_climate_data()
+            tasks["climate"] = self._cached("climate", self.data_scraper.get_climate_data)
         
         # Add market price data if relevant
-        if "price" in requirements.get("query_text", "").lower() or "market" in requirements.get("query_text", "").lower():
-            data["prices"] = self.data_scraper.get_market_prices()
+        query_text = requirements.get("query_text", "").lower()
+        if "price" in query_text or "market" in query_text:
+            tasks["prices"] = self._cached("prices", self.data_scraper.get_market_prices)
         
-        return data
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks.keys(), results))
+    
+    async def _cached(self, key: str, fetch: Callable[[], Dict], ttl: int = QUERY_CACHE_TTL_SECONDS) -> Dict:
+        """Return a data source response shared by all queries within ttl seconds of its fetch"""
+        hit = self._cache.get(key)
+        if hit and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+        
+        async with self._cache_locks.setdefault(key, asyncio.Lock()):
+            # Another query may have fetched it while this one waited for the lock
+            hit = self._cache.get(key)
+            if hit and time.monotonic() - hit[0] < ttl:
+                return hit[1]
+            
+            # The scrapers block on HTTP and disk I/O, so run them off the event loop
+            data = await asyncio.to_thread(fetch)
+            self._cache[key] = (time.monotonic(), data)
+            return data
     
     def assess_data_quality(self, data: Dict) -> Dict[str, Any]:
         """Assess quality of fetched data"""
@@ -188,11 +228,13 @@ class QueryProcessor:
             
         return quality_assessment
     
-    def generate_answer(self, question: str, data: Dict, quality_assessment: Dict = None) -> Dict:
+    def generate_answer(self, question: str, data: Dict, quality_assessment: Dict = None,
+                        entities: Dict = None) -> Dict:
         """Generate a natural language answer from the data"""
         
-        # Extract entities to provide targeted answers
-        entities = self.extract_entities(question)
+        # Extract entities to provide targeted answers, unless the caller already has them
+        if entities is None:
+            entities = self.extract_entities(question)
         
         # Start building the response
         sections = []
@@ -207,17 +249,10 @@ class QueryProcessor:
                 "url": agri_data["url"]
             })
             
-            # Filter data based on user's question
-            relevant_data = agri_data["data"]
-            if entities.get("states"):
-                relevant_data = [item for item in agri_data["data"] 
-                               if any(state.lower() in item["state"].lower() for state in entities["states"])]
+            # Filter data based on user's question, grouping it by state in the same pass
+            state_data, state_totals = self._group_agricultural_data(agri_data["data"], entities)
             
-            if entities.get("crops"):
-                relevant_data = [item for item in relevant_data 
-                               if any(crop.lower() in item["crop"].lower() for crop in entities["crops"])]
-            
-            agri_section = self._format_agricultural_section(relevant_data, agri_data["data"], entities)
+            agri_section = self._format_agricultural_section(state_data, state_totals, agri_data["data"], entities)
             if agri_section:
                 sections.append(agri_section)
         
@@ -256,21 +291,50 @@ class QueryProcessor:
             "sources": sources
         }
     
-    def _format_agricultural_section(self, relevant_data, all_data, entities):
+    def _mention_filter(self, names: List[str]):
+        """Predicate telling whether a value mentions any of the names (case-insensitive substring),
+        or None if there are no names to filter on"""
+        if not names:
+            return None
+        pattern = re.compile('|'.join(map(re.escape, names)), re.IGNORECASE)
+        
+        # Records repeat a handful of state and crop labels, so each distinct label is searched
+        # once and every later record costs a dict lookup
+        verdicts = {}
+        
+        def mentions(value: str) -> bool:
+            verdict = verdicts.get(value)
+            if verdict is None:
+                verdict = verdicts[value] = pattern.search(value) is not None
+            return verdict
+        
+        return mentions
+    
+    def _group_agricultural_data(self, records: List[Dict], entities: Dict):
+        """Keep the records matching the requested states and crops, grouped by state with production totals"""
+        mentions_state = self._mention_filter(entities.get("states"))
+        mentions_crop = self._mention_filter(entities.get("crops"))
+        
+        state_data = defaultdict(list)
+        state_totals = defaultdict(int)
+        for item in records:
+            if mentions_state and not mentions_state(item["state"]):
+                continue
+            if mentions_crop and not mentions_crop(item["crop"]):
+                continue
+            state_data[item["state"]].append(item)
+            state_totals[item["state"]] += item["production_tonnes"]
+        
+        return state_data, state_totals
+    
+    def _format_agricultural_section(self, state_data, state_totals, all_data, entities):
         """Format agricultural data section"""
         section = "AGRICULTURAL PRODUCTION ANALYSIS\n" + "-"*35
         
-        if relevant_data:
-            # Group by state for comparison
-            state_data = {}
-            for item in relevant_data:
-                state = item["state"]
-                if state not in state_data:
-                    state_data[state] = []
-                state_data[state].append(item)
-            
+        if state_data:
+            # Grouped by state for comparison
             for state, items in state_data.items():
-                total_production = sum(item["production_tonnes"] for item in items)
+                total_production = state_totals[state]
                 section += f"\n\n{state.upper()}:\n"
                 section += f"  Total Production: {total_production:,} tonnes\n"
                 
@@ -304,9 +368,9 @@ class QueryProcessor:
         
         # Filter climate data by requested states
         relevant_climate = climate_data
-        if entities.get("states"):
-            relevant_climate = [item for item in climate_data 
-                              if any(state.lower() in item["state"].lower() for state in entities["states"])]
+        mentions_state = self._mention_filter(entities.get("states"))
+        if mentions_state:
+            relevant_climate = [item for item in climate_data if mentions_state(item["state"])]
         
         if relevant_climate and any(item["rainfall_mm"] > 0 for item in relevant_climate):
             section += f"\n\n{'Location':<25} {'Rainfall (mm)':<15} {'Temperature (°C)'}\n"